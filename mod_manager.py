@@ -3,44 +3,727 @@ import shutil
 import json
 import glob
 import re
+import errno
+import threading
+import hashlib
+import sqlite3
+import concurrent.futures
 from PyQt5 import QtWidgets, QtCore, QtGui
 
 PRESETS_FILE = 'mod_presets.json'
+GROUPS_FILE = 'mod_groups.json'
+INFER_OVERLAP = 0.5
+INDEX_FILE = 'mod_index.db'
+INDEX_FIELDS = {'name': 'name', 'author': 'author', 'key': 'keys', 'tag': 'tags'}
+AUTHOR_RE = re.compile(r'(?:author|created by|made by|credits?)\s*[:=\-]?\s*(.+)', re.IGNORECASE)
+TEXT_EXTENSIONS = ('.txt', '.md')
+TEXT_SIZE_LIMIT = 1 << 20
+FIXER_PATTERN = 'genshin_update_mods_*.exe'
+PATH_CHECK_DELAY = 300
+BUFFER_EXTENSIONS = ('.buf', '.ib')
+SECTION_RE = re.compile(r'\[([^\[\]]*)\]$')
+VARIABLE_RE = re.compile(r'\$(?!\\)(\w+)')
+MERGED_INI = 'merged.ini'
+MERGED_MANIFEST = 'merged.json'
+MERGED_RESOURCES = 'Resources'
+MERGED_KEY = 'VK_ADD'
+OVERRIDE_SETTINGS = ('hash', 'match_', 'filter_index', 'allow_duplicate_hash', 'format', 'width', 'height', 'iteration')
+
+def find_fixer_files(main_folder):
+    # Check in the main folder and in its parent folder
+    fixer_files = glob.glob(os.path.join(glob.escape(main_folder), FIXER_PATTERN))
+    fixer_files += glob.glob(os.path.join(glob.escape(os.path.dirname(main_folder)), FIXER_PATTERN))
+    return fixer_files
+
+def read_preset_names(main_folder):
+    try:
+        with open(PRESETS_FILE, 'r') as file:
+            presets = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return []
+    return list(presets.get(main_folder, {}).keys())
+
+def is_mods_root(main_folder):
+    parent_folder = os.path.dirname(main_folder)
+    return os.path.isdir(os.path.join(parent_folder, 'disabledMods')) or os.path.isfile(os.path.join(parent_folder, '3DMigoto Loader.exe'))
+
+def read_groups(main_folder):
+    try:
+        with open(GROUPS_FILE, 'r') as file:
+            groups = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return groups.get(main_folder, {})
+
+def index_groups(groups):
+    return {mod: group for group, mods in groups.items() for mod in mods}
+
+def find_group_conflicts(enabled_mods, group_index):
+    conflicts = {}
+    for mod in enabled_mods:
+        if mod in group_index:
+            conflicts.setdefault(group_index[mod], []).append(mod)
+    return {group: mods for group, mods in conflicts.items() if len(mods) > 1}
+
+def read_override_hashes(mod_path):
+    hashes = set()
+    for root, name, lines in read_ini_sections(mod_path):
+        if name.lower().startswith('textureoverride'):
+            for line in lines:
+                key, sep, value = line.partition('=')
+                if sep and key.strip().lower() == 'hash':
+                    hashes.add(value.strip().lower())
+    return hashes
+
+def open_index():
+    connection = sqlite3.connect(INDEX_FILE, timeout=10)
+    connection.executescript('''
+        CREATE TABLE IF NOT EXISTS mods (id INTEGER PRIMARY KEY, root TEXT, name TEXT, signature REAL, UNIQUE (root, name));
+        CREATE TABLE IF NOT EXISTS tags (root TEXT, name TEXT, tag TEXT, UNIQUE (root, name, tag));
+        CREATE VIRTUAL TABLE IF NOT EXISTS mod_text USING fts5(name, author, keys, tags, content);
+    ''')
+    return connection
+
+def read_mod_text(mod_path):
+    authors, keys, content = [], [], []
+    for root, dirs, files in os.walk(mod_path):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if name.lower().endswith('.ini'):
+                    section = ''
+                    with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+                        for line in file:
+                            line = line.strip()
+                            match = SECTION_RE.match(line)
+                            if line.startswith(';'):
+                                comment = line.lstrip(';').strip()
+                                content.append(comment)
+                                authors += AUTHOR_RE.findall(comment)
+                            elif match:
+                                section = match.group(1).strip()
+                                # Split TextureOverrideRaidenBody so "raiden" finds it
+                                content.append(re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', section))
+                            else:
+                                key, sep, value = line.partition('=')
+                                if sep and key.strip().lower() == 'key' and section.lower().startswith('key'):
+                                    keys.append(value.strip())
+                elif name.lower().endswith(TEXT_EXTENSIONS) and os.path.getsize(path) <= TEXT_SIZE_LIMIT:
+                    with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+                        text = file.read()
+                    content.append(text)
+                    authors += AUTHOR_RE.findall(text)
+            except OSError:
+                pass
+    return ' '.join(authors), ' '.join(keys), '\n'.join(content)
+
+def build_match_query(text):
+    terms = []
+    for field, value, word in re.findall(r'(\w+):("[^"]*"|\S+)|("[^"]*"|\S+)', text):
+        column = INDEX_FIELDS.get(field.lower())
+        if field and column is None:
+            value = f'{field}:{value}'
+        term = (value or word).strip('"').replace('"', '""')
+        if term:
+            terms.append(f'{column} : "{term}"*' if column else f'"{term}"*')
+    return ' AND '.join(terms) or None
+
+def search_index(main_folder, text):
+    query = build_match_query(text)
+    if query is None:
+        return None
+    try:
+        connection = open_index()
+        try:
+            rows = connection.execute('SELECT mods.name FROM mod_text JOIN mods ON mods.id = mod_text.rowid WHERE mods.root = ? AND mod_text MATCH ?', (main_folder, query))
+            return {row[0] for row in rows}
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+
+# Serialises every folder move so a mod can't be moved twice at once
+MOVE_LOCK = threading.RLock()
+
+def mod_folder(main_folder, folder_name, action):
+    # Enabled mods are the ones offering 'Disable'
+    if action == 'Disable':
+        return os.path.join(main_folder, folder_name)
+    return os.path.join(os.path.dirname(main_folder), 'disabledMods', folder_name)
+
+def move_folder(source_folder, target_folder):
+    if not os.path.exists(source_folder):
+        raise FileNotFoundError(f'Source folder not found: {source_folder}')
+    # Moving onto an existing folder would nest the mod inside it
+    if os.path.exists(target_folder):
+        raise FileExistsError(f'Target folder already exists: {target_folder}')
+    os.makedirs(os.path.dirname(target_folder), exist_ok=True)
+    try:
+        os.rename(source_folder, target_folder)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Across drives, only delete the source once the copy is complete
+        try:
+            shutil.copytree(source_folder, target_folder)
+        except Exception:
+            shutil.rmtree(target_folder, ignore_errors=True)
+            raise
+        try:
+            shutil.rmtree(source_folder)
+        except Exception as e:
+            restore_folder(source_folder, target_folder, e)
+            raise
+
+def restore_folder(source_folder, target_folder, error):
+    # Deleting the source stopped halfway, so the copy is the only complete one.
+    # Put back what was already deleted, skipping files still there (they may be the locked ones).
+    try:
+        shutil.copytree(target_folder, source_folder, dirs_exist_ok=True,
+                        copy_function=lambda src, dst: os.path.exists(dst) or shutil.copy2(src, dst))
+    except Exception:
+        raise OSError(f'Move failed halfway: the complete mod is at {target_folder}, {source_folder} is incomplete ({error})') from error
+    try:
+        shutil.rmtree(target_folder)
+    except Exception:
+        raise OSError(f'Move failed halfway: {source_folder} was restored but {target_folder} could not be removed ({error})') from error
+
+def move_mod(main_folder, folder_name, action):
+    target_action = 'Enable' if action == 'Disable' else 'Disable'
+    with MOVE_LOCK:
+        move_folder(mod_folder(main_folder, folder_name, action), mod_folder(main_folder, folder_name, target_action))
+
+def mark_mod_broken(main_folder, folder_name, action):
+    with MOVE_LOCK:
+        move_folder(mod_folder(main_folder, folder_name, action), os.path.join(os.path.dirname(main_folder), 'brokenMods', folder_name))
+
+def rename_in_presets(main_folder, old_name, new_name):
+    try:
+        with open(PRESETS_FILE, 'r') as file:
+            presets = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return
+    for preset in presets.get(main_folder, {}).values():
+        if old_name in preset['enabled']:
+            preset['enabled'].remove(old_name)
+            preset['enabled'].append(new_name)
+        if old_name in preset['disabled']:
+            preset['disabled'].remove(old_name)
+            preset['disabled'].append(new_name)
+    with open(PRESETS_FILE, 'w') as file:
+        json.dump(presets, file, indent=4)
+
+def rename_mod(main_folder, folder_name, action, new_name):
+    # Presets are updated under the same lock so they never point at a name in between
+    with MOVE_LOCK:
+        move_folder(mod_folder(main_folder, folder_name, action), mod_folder(main_folder, new_name, action))
+        rename_in_presets(main_folder, folder_name, new_name)
+
+def apply_preset(main_folder, enabled_mods, disabled_mods):
+    missing_mods = []
+    failed_mods = []
+    with MOVE_LOCK:
+        for mods, action in ((enabled_mods, 'Enable'), (disabled_mods, 'Disable')):
+            target_action = 'Disable' if action == 'Enable' else 'Enable'
+            for mod in mods:
+                if os.path.isdir(mod_folder(main_folder, mod, target_action)):
+                    continue
+                try:
+                    move_mod(main_folder, mod, action)
+                except FileNotFoundError:
+                    missing_mods.append(mod)
+                except OSError as e:
+                    failed_mods.append(f'{mod} ({e})')
+    return missing_mods, failed_mods
 
 class MoveThread(QtCore.QThread):
     update_status = QtCore.pyqtSignal(str, str, object)
 
-    def __init__(self, folder_name, action, main_folder, parent=None):
+    def __init__(self, folder_name, action, main_folder, group_members=(), parent=None):
         super(MoveThread, self).__init__(parent)
         self.folder_name = folder_name
         self.action = action
         self.main_folder = main_folder
+        self.group_members = list(group_members)
 
     def run(self):
         try:
-            if self.action == 'Disable':
-                source_folder = os.path.join(self.main_folder, self.folder_name)
-                target_folder = os.path.join(os.path.dirname(self.main_folder), 'disabledMods')
-                if not os.path.exists(target_folder):
-                    os.makedirs(target_folder)
-                if os.path.exists(source_folder):
-                    shutil.move(source_folder, target_folder)
-                else:
-                    raise FileNotFoundError(f'Source folder not found: {source_folder}')
-            else:
-                source_folder = os.path.join(os.path.dirname(self.main_folder), 'disabledMods', self.folder_name)
-                target_folder = self.main_folder
-                if os.path.exists(source_folder):
-                    shutil.move(source_folder, target_folder)
-                else:
-                    raise FileNotFoundError(f'Source folder not found: {source_folder}')
-            
+            # Siblings are looked up under the lock so two quick clicks can't both see the slot free
+            with MOVE_LOCK:
+                if self.action == 'Enable':
+                    for folder_name in self.group_members:
+                        if folder_name != self.folder_name and os.path.isdir(os.path.join(self.main_folder, folder_name)):
+                            move_mod(self.main_folder, folder_name, 'Disable')
+                move_mod(self.main_folder, self.folder_name, self.action)
             status = 'Success'
         except Exception as e:
+            # A sibling that couldn't be disabled stops the enable, one active mod per group
             status = f'Error: {e}'
-        
+
         self.update_status.emit(status, self.action, self.folder_name)
 
+def mod_signature(mod_path):
+    latest = os.path.getmtime(mod_path)
+    for root, dirs, files in os.walk(mod_path):
+        for name in dirs + files:
+            try:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+            except OSError:
+                pass
+    return latest
+
+def validate_ini(ini_path, mod_path):
+    ini_name = os.path.relpath(ini_path, mod_path)
+    ini_dir = os.path.dirname(ini_path)
+    try:
+        with open(ini_path, 'r', encoding='utf-8', errors='ignore') as file:
+            lines = file.readlines()
+    except OSError as e:
+        return [f'{ini_name}: {e}']
+
+    problems = []
+    sections = set()
+    section = ''
+    key_sections = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+
+        if line.startswith('['):
+            match = SECTION_RE.match(line)
+            if not match or not match.group(1).strip():
+                problems.append(f'{ini_name}:{number}: malformed section {line}')
+                section = ''
+                continue
+            section = match.group(1).strip()
+            if section.lower() in sections:
+                problems.append(f'{ini_name}:{number}: duplicate section [{section}]')
+            sections.add(section.lower())
+            if section.lower().startswith('key'):
+                key_sections.append({'name': section, 'keys': [], 'condition': ''})
+            continue
+
+        name, sep, value = line.partition('=')
+        if not sep:
+            continue
+        name = name.strip().lower()
+        value = value.strip()
+
+        if name == 'filename':
+            # 3dmigoto paths are relative to the ini and use backslashes
+            resource = os.path.join(ini_dir, value.strip('"').replace('\\', os.sep))
+            if not os.path.isfile(resource):
+                problems.append(f'{ini_name}:{number}: missing resource {value}')
+            elif resource.lower().endswith(BUFFER_EXTENSIONS) and os.path.getsize(resource) == 0:
+                problems.append(f'{ini_name}:{number}: empty buffer {value}')
+        elif name == 'key' and section.lower().startswith('key'):
+            key_sections[-1]['keys'].append((number, value))
+        elif name == 'condition' and section.lower().startswith('key'):
+            key_sections[-1]['condition'] = ''.join(value.lower().split())
+
+    # The same key under different conditions is how merged mods switch variants
+    key_bindings = {}
+    for key_section in key_sections:
+        for number, value in key_section['keys']:
+            binding = (' '.join(value.lower().split()), key_section['condition'])
+            if binding in key_bindings:
+                problems.append(f'{ini_name}:{number}: key {value} already bound in [{key_bindings[binding]}]')
+            else:
+                key_bindings[binding] = key_section['name']
+    return problems
+
+def validate_mod(mod_path):
+    problems = []
+    for root, dirs, files in os.walk(mod_path):
+        for name in files:
+            # 3dmigoto skips ini files prefixed with DISABLED
+            if name.lower().endswith('.ini') and not name.lower().startswith('disabled'):
+                problems += validate_ini(os.path.join(root, name), mod_path)
+    return problems
+
+def read_ini_sections(mod_path):
+    sections = []
+    for root, dirs, files in os.walk(mod_path):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith('.ini') or name.lower().startswith('disabled'):
+                continue
+            section = None
+            with open(os.path.join(root, name), 'r', encoding='utf-8', errors='ignore') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line or line.startswith(';'):
+                        continue
+                    match = SECTION_RE.match(line)
+                    if match:
+                        section = (root, match.group(1).strip(), [])
+                        sections.append(section)
+                    elif section is not None:
+                        section[2].append(line)
+    return sections
+
+def store_resource(source, output_folder):
+    digest = hashlib.sha1()
+    with open(source, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    # Identical files across variants end up under the same name and are stored once
+    resource_name = digest.hexdigest()[:16] + os.path.splitext(source)[1].lower()
+    target = os.path.join(output_folder, MERGED_RESOURCES, resource_name)
+    if not os.path.exists(target):
+        shutil.copy2(source, target)
+    return resource_name
+
+def build_variant(index, mod_path, output_folder):
+    sections = read_ini_sections(mod_path)
+    suffix = f'_{index}'
+    renames = {name.lower(): name + suffix for root, name, lines in sections if name.lower() not in ('constants', 'present')}
+    names_re = None
+    if renames:
+        pattern = '|'.join(re.escape(name) for name in sorted(renames, key=len, reverse=True))
+        names_re = re.compile(rf'(?<![\w.])({pattern})(?![\w.])', re.IGNORECASE)
+    resources = set()
+
+    def rewrite(root, line):
+        name, sep, value = line.partition('=')
+        if sep and name.strip().lower() == 'filename':
+            source = os.path.join(root, value.strip().strip('"').replace('\\', os.sep))
+            if os.path.isfile(source):
+                resource_name = store_resource(source, output_folder)
+                resources.add(resource_name)
+                return f'filename = {MERGED_RESOURCES}\\{resource_name}'
+            return line
+        line = VARIABLE_RE.sub(lambda m: f'${m.group(1)}{suffix}', line)
+        if names_re is not None:
+            line = names_re.sub(lambda m: renames[m.group(1).lower()], line)
+        return line
+
+    variant = {'constants': [], 'present': [], 'overrides': [], 'sections': [], 'resources': []}
+    for root, name, lines in sections:
+        lower = name.lower()
+        lines = [rewrite(root, line) for line in lines]
+        if lower == 'constants':
+            variant['constants'] += lines
+        elif lower == 'present':
+            variant['present'] += lines
+        elif lower.startswith(('textureoverride', 'shaderoverride')):
+            is_setting = [l.split('=')[0].strip().lower().startswith(OVERRIDE_SETTINGS) for l in lines]
+            settings = [l for l, setting in zip(lines, is_setting) if setting]
+            commands = [l for l, setting in zip(lines, is_setting) if not setting]
+            variant['overrides'].append({'name': renames[lower], 'settings': settings, 'commands': commands})
+        elif lower.startswith('key'):
+            conditions = [l.split('=', 1)[1].strip() for l in lines if l.split('=')[0].strip().lower() == 'condition']
+            lines = [l for l in lines if l.split('=')[0].strip().lower() != 'condition']
+            condition = ' && '.join([f'$swapvar == {index}'] + [f'({c})' for c in conditions])
+            variant['sections'] += [f'[{renames[lower]}]', f'condition = {condition}'] + lines + ['']
+        else:
+            variant['sections'] += [f'[{renames[lower]}]'] + lines + ['']
+    variant['resources'] = sorted(resources)
+    return variant
+
+def check_merged_name(main_folder, name):
+    if not name or '/' in name or '\\' in name or '..' in name:
+        raise ValueError(f'Invalid merged mod name: "{name}"')
+    if os.path.exists(mod_folder(main_folder, name, 'Enable')):
+        raise ValueError(f'A disabled mod named "{name}" already exists')
+    # Only rebuild folders this builder created, never overwrite a regular mod
+    output_folder = mod_folder(main_folder, name, 'Disable')
+    if os.path.exists(output_folder) and not os.path.isfile(os.path.join(output_folder, MERGED_MANIFEST)):
+        raise ValueError(f'A mod named "{name}" already exists and was not built by the merger')
+
+def build_merged_mod(output_folder, variants, key=MERGED_KEY):
+    check_merged_name(os.path.dirname(output_folder), os.path.basename(output_folder))
+    for name, mod_path in variants:
+        if os.path.abspath(mod_path) == os.path.abspath(output_folder):
+            raise ValueError(f'Cannot merge "{name}" into itself')
+
+    os.makedirs(os.path.join(output_folder, MERGED_RESOURCES), exist_ok=True)
+    manifest_path = os.path.join(output_folder, MERGED_MANIFEST)
+    try:
+        with open(manifest_path, 'r') as file:
+            previous = {v['name']: v for v in json.load(file)['variants']}
+    except (FileNotFoundError, ValueError, KeyError):
+        previous = {}
+
+    built = []
+    for index, (name, mod_path) in enumerate(variants):
+        signature = mod_signature(mod_path)
+        cached = previous.get(name)
+        # Only variants whose files changed (or moved to another slot) are rebuilt
+        if (cached and cached['signature'] == signature and cached['index'] == index and
+                all(os.path.exists(os.path.join(output_folder, MERGED_RESOURCES, r)) for r in cached['resources'])):
+            variant = cached
+        else:
+            variant = build_variant(index, mod_path, output_folder)
+            variant.update({'name': name, 'signature': signature, 'index': index})
+        built.append(variant)
+
+    lines = ['; Generated by Mod Manager, changes will be overwritten on rebuild']
+    lines += [f'; {variant["index"]} = {variant["name"]}' for variant in built]
+    lines += ['', '[Constants]', 'global persist $swapvar = 0']
+    for variant in built:
+        lines += variant['constants']
+    lines += ['', '[KeySwap]', f'key = {key}', 'type = cycle', '$swapvar = ' + ','.join(str(v['index']) for v in built), '']
+    if any(variant['present'] for variant in built):
+        lines.append('[Present]')
+        for variant in built:
+            if variant['present']:
+                lines += [f'if $swapvar == {variant["index"]}'] + variant['present'] + ['endif']
+        lines.append('')
+    # 3dmigoto warns about one hash in several sections, so each hash gets one section with a branch per variant
+    overrides = {}
+    for variant in built:
+        for override in variant['overrides']:
+            match = tuple(sorted(''.join(l.split()).lower() for l in override['settings'] if l.split('=')[0].strip().lower().startswith(('hash', 'match_'))))
+            overrides.setdefault(match, []).append((variant['index'], override))
+    for group in overrides.values():
+        lines += [f'[{group[0][1]["name"]}]'] + group[0][1]['settings']
+        for n, (index, override) in enumerate(group):
+            lines += [f'{"if" if n == 0 else "else if"} $swapvar == {index}'] + override['commands']
+        lines += ['endif', '']
+    for variant in built:
+        lines += variant['sections']
+
+    with open(os.path.join(output_folder, MERGED_INI), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+    with open(manifest_path, 'w') as file:
+        json.dump({'key': key, 'variants': built}, file, indent=4)
+
+    # Drop resources no variant refers to anymore
+    used = {r for variant in built for r in variant['resources']}
+    for resource_name in os.listdir(os.path.join(output_folder, MERGED_RESOURCES)):
+        if resource_name not in used:
+            os.remove(os.path.join(output_folder, MERGED_RESOURCES, resource_name))
+
+class PresetThread(QtCore.QThread):
+    preset_loaded = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, main_folder, enabled_mods, disabled_mods, parent=None):
+        super(PresetThread, self).__init__(parent)
+        self.main_folder = main_folder
+        self.enabled_mods = enabled_mods
+        self.disabled_mods = disabled_mods
+
+    def run(self):
+        # Always emit so the window releases its pending move and re-enables loading
+        try:
+            missing_mods, failed_mods = apply_preset(self.main_folder, self.enabled_mods, self.disabled_mods)
+        except Exception as e:
+            missing_mods, failed_mods = [], [f'preset ({e})']
+        self.preset_loaded.emit(missing_mods, failed_mods)
+
+class TaskThread(QtCore.QThread):
+    task_done = QtCore.pyqtSignal(str, object, object)
+
+    def __init__(self, callback, task, args, parent=None):
+        super(TaskThread, self).__init__(parent)
+        self.callback = callback
+        self.task = task
+        self.args = args
+
+    def run(self):
+        result = None
+        try:
+            result = self.task(*self.args)
+            status = 'Success'
+        except Exception as e:
+            status = f'Error: {e}'
+
+        self.task_done.emit(status, result, self.callback)
+
+class MergeThread(QtCore.QThread):
+    update_status = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, output_folder, variants, key, parent=None):
+        super(MergeThread, self).__init__(parent)
+        self.output_folder = output_folder
+        self.variants = variants
+        self.key = key
+
+    def run(self):
+        try:
+            build_merged_mod(self.output_folder, self.variants, self.key)
+            status = 'Success'
+        except Exception as e:
+            status = f'Error: {e}'
+
+        self.update_status.emit(status, self.variants)
+
+class InferGroupsThread(QtCore.QThread):
+    groups_inferred = QtCore.pyqtSignal(object)
+
+    def __init__(self, mods, groups, parent=None):
+        super(InferGroupsThread, self).__init__(parent)
+        self.mods = mods
+        self.groups = {group: list(members) for group, members in groups.items()}
+
+    def read_hashes(self, mod_path):
+        if self.isInterruptionRequested():
+            return set()
+        # Mods can be moved while this runs, a mod that can't be read just isn't grouped
+        try:
+            return read_override_hashes(mod_path)
+        except OSError:
+            return set()
+
+    def run(self):
+        try:
+            groups = self.infer_groups()
+        except Exception:
+            groups = {}
+        self.groups_inferred.emit(groups)
+
+    def infer_groups(self):
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            mod_hashes = dict(zip([name for name, mod_path in self.mods],
+                                  executor.map(lambda mod: self.read_hashes(mod[1]), self.mods)))
+
+        def overlap(a, b):
+            if not a or not b:
+                return 0
+            return len(a & b) / min(len(a), len(b))
+
+        # Mods overriding mostly the same hashes replace the same model, so they can't be active together.
+        # A mod has to overlap every member of a group to join it, so one shared hash can't chain groups.
+        grouped = {mod for members in self.groups.values() for mod in members}
+        added = {}
+        for name in sorted(mod_hashes, key=str.lower):
+            if name in grouped or not mod_hashes[name]:
+                continue
+            best_group, best_score = None, 0
+            for group, members in self.groups.items():
+                scores = [overlap(mod_hashes[name], mod_hashes[member]) for member in members if member in mod_hashes]
+                if scores and min(scores) > best_score:
+                    best_group, best_score = group, min(scores)
+            if best_score >= INFER_OVERLAP:
+                self.groups[best_group].append(name)
+                added.setdefault(best_group, []).append(name)
+            else:
+                group = f'auto: {name}'
+                while group in self.groups:
+                    group += "'"
+                self.groups[group] = [name]
+                added[group] = [name]
+
+        # A new group nobody joined isn't a group
+        return {group: mods for group, mods in added.items() if len(self.groups[group]) > 1}
+
+class IndexThread(QtCore.QThread):
+    index_updated = QtCore.pyqtSignal(str)
+
+    def __init__(self, main_folder, mods, parent=None):
+        super(IndexThread, self).__init__(parent)
+        self.main_folder = main_folder
+        self.mods = mods
+
+    def run(self):
+        try:
+            connection = open_index()
+            try:
+                self.update_index(connection)
+            finally:
+                connection.close()
+            status = 'Success'
+        except Exception as e:
+            status = f'Error: {e}'
+
+        self.index_updated.emit(status)
+
+    def update_index(self, connection):
+        stored = {name: (row_id, signature) for row_id, name, signature in
+                  connection.execute('SELECT id, name, signature FROM mods WHERE root = ?', (self.main_folder,))}
+        current = {}
+        for name, mod_path in self.mods:
+            if self.isInterruptionRequested():
+                return
+            try:
+                current[name] = (mod_path, mod_signature(mod_path))
+            except OSError:
+                pass
+
+        # Only mods that are new or changed since the last run get read again
+        changed = [name for name, (mod_path, signature) in current.items() if name not in stored or stored[name][1] != signature]
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            texts = dict(zip(changed, executor.map(lambda name: None if self.isInterruptionRequested() else read_mod_text(current[name][0]), changed)))
+        # An interrupted run writes nothing, the next run picks the changes up
+        if self.isInterruptionRequested():
+            return
+
+        with connection:
+            for name in set(stored) - set(current):
+                connection.execute('DELETE FROM mods WHERE id = ?', (stored[name][0],))
+                connection.execute('DELETE FROM mod_text WHERE rowid = ?', (stored[name][0],))
+
+            for name in changed:
+                tags = ', '.join(tag for (tag,) in connection.execute('SELECT tag FROM tags WHERE root = ? AND name = ?', (self.main_folder, name)))
+                if name in stored:
+                    row_id = stored[name][0]
+                    connection.execute('UPDATE mods SET signature = ? WHERE id = ?', (current[name][1], row_id))
+                    connection.execute('DELETE FROM mod_text WHERE rowid = ?', (row_id,))
+                else:
+                    row_id = connection.execute('INSERT INTO mods (root, name, signature) VALUES (?, ?, ?)',
+                                                (self.main_folder, name, current[name][1])).lastrowid
+                author, keys, content = texts[name]
+                connection.execute('INSERT INTO mod_text (rowid, name, author, keys, tags, content) VALUES (?, ?, ?, ?, ?, ?)',
+                                   (row_id, name, author, keys, tags, content))
+
+class ValidateThread(QtCore.QThread):
+    validation_done = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, main_folder, mods, cache, parent=None):
+        super(ValidateThread, self).__init__(parent)
+        self.main_folder = main_folder
+        self.mods = mods
+        self.cache = cache
+
+    def check_mod(self, folder_name, mod_path):
+        if self.isInterruptionRequested():
+            return []
+        try:
+            signature = mod_signature(mod_path)
+            cached = self.cache.get(mod_path)
+            if cached and cached[0] == signature:
+                return cached[1]
+            problems = validate_mod(mod_path)
+            self.cache[mod_path] = (signature, problems)
+            return problems
+        except Exception as e:
+            return [str(e)]
+
+    def run(self):
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = {executor.submit(self.check_mod, folder_name, mod_path): (folder_name, action)
+                       for folder_name, action, mod_path in self.mods}
+            for future in concurrent.futures.as_completed(futures):
+                folder_name, action = futures[future]
+                results[folder_name] = (action, future.result())
+        self.validation_done.emit(self.main_folder, results)
+
+class PathCheckThread(QtCore.QThread):
+    path_checked = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, path, parent=None):
+        super(PathCheckThread, self).__init__(parent)
+        self.path = path
+
+    def run(self):
+        valid = len(self.path) > 3 and os.path.isdir(self.path)
+        fixer_files = []
+        preset_names = []
+        if valid and not self.isInterruptionRequested():
+            fixer_files = find_fixer_files(self.path)
+        groups = {}
+        mods_root = False
+        if valid and not self.isInterruptionRequested():
+            preset_names = read_preset_names(self.path)
+            groups = read_groups(self.path)
+            mods_root = is_mods_root(self.path)
+        if self.isInterruptionRequested():
+            return
+        self.path_checked.emit(self.path, (valid, fixer_files, preset_names, groups, mods_root))
+
 class ClickableDot(QtWidgets.QLabel):
     clicked = QtCore.pyqtSignal()
     hovered = QtCore.pyqtSignal(bool)
@@ -85,7 +768,13 @@ class FolderItem(QtWidgets.QWidget):
         layout.addWidget(self.dot)
 
         self.label = QtWidgets.QLabel(self.folder_name)
-        self.label.setStyleSheet("color: white;")
+        if self.folder_name in self.manager.group_index:
+            self.label.setText(f'{self.folder_name}   [{self.manager.group_index[self.folder_name]}]')
+        if self.folder_name in self.manager.broken_mods:
+            self.label.setStyleSheet("color: #ffb347;")
+            self.label.setToolTip('\n'.join(self.manager.broken_mods[self.folder_name][1]))
+        else:
+            self.label.setStyleSheet("color: white;")
         layout.addWidget(self.label)
 
         self.keys_label = QtWidgets.QLabel('')
@@ -113,6 +802,8 @@ class FolderItem(QtWidgets.QWidget):
         rename_action = menu.addAction("Rename")
         open_action = menu.addAction("Open in Explorer")
         mark_broken_action = menu.addAction("Mark as broken")
+        group_action = menu.addAction("Set exclusive group...")
+        tags_action = menu.addAction("Edit tags...")
         action = menu.exec_(self.label.mapToGlobal(position))
         if action == rename_action:
             self.start_rename()
@@ -120,6 +811,10 @@ class FolderItem(QtWidgets.QWidget):
             self.open_in_explorer()
         elif action == mark_broken_action:
             self.manager.mark_as_broken(self.folder_name, self.action)
+        elif action == group_action:
+            self.manager.set_mod_group(self.folder_name)
+        elif action == tags_action:
+            self.manager.set_mod_tags(self.folder_name)
 
 
 
@@ -128,21 +823,7 @@ class FolderItem(QtWidgets.QWidget):
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             new_name = dialog.get_new_name()
             if new_name and new_name != self.folder_name:
-                try:
-                    if self.action == 'Disable':
-                        source_folder = os.path.join(self.manager.main_folder, self.folder_name)
-                        target_folder = os.path.join(self.manager.main_folder, new_name)
-                    else:
-                        source_folder = os.path.join(os.path.dirname(self.manager.main_folder), 'disabledMods', self.folder_name)
-                        target_folder = os.path.join(os.path.dirname(self.manager.main_folder), 'disabledMods', new_name)
-                    
-                    os.rename(source_folder, target_folder)
-                    self.manager.update_preset_names(self.folder_name, new_name)
-                    self.folder_name = new_name
-                    self.label.setText(new_name)
-                    self.manager.display_folders()
-                except Exception as e:
-                    QtWidgets.QMessageBox.critical(self, 'Error', str(e))
+                self.manager.rename_folder(self.folder_name, self.action, new_name)
 
     def open_in_explorer(self):
         folder_path = os.path.join(self.manager.main_folder, self.folder_name)
@@ -211,6 +892,75 @@ class RenameDialog(QtWidgets.QDialog):
         else:
             QtWidgets.QMessageBox.warning(self, 'Warning', 'New name must be different and non-empty')
 
+class MergeDialog(QtWidgets.QDialog):
+    def __init__(self, mod_names, main_folder, parent=None):
+        super().__init__(parent)
+        self.main_folder = main_folder
+
+        self.setWindowTitle("Build Merged Mod")
+        self.setModal(True)
+        self.resize(350, 450)
+
+        layout = QtWidgets.QVBoxLayout()
+
+        self.name_edit = QtWidgets.QLineEdit()
+        self.name_edit.setPlaceholderText('Merged mod name...')
+        self.name_edit.setStyleSheet("color: white; background-color: #333;")
+        layout.addWidget(self.name_edit)
+
+        self.key_edit = QtWidgets.QLineEdit(MERGED_KEY)
+        self.key_edit.setPlaceholderText('Cycle key...')
+        self.key_edit.setStyleSheet("color: white; background-color: #333;")
+        layout.addWidget(self.key_edit)
+
+        self.mod_list = QtWidgets.QListWidget()
+        for mod_name in mod_names:
+            item = QtWidgets.QListWidgetItem(mod_name)
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.Unchecked)
+            self.mod_list.addItem(item)
+        layout.addWidget(self.mod_list)
+
+        button_layout = QtWidgets.QHBoxLayout()
+
+        self.build_button = QtWidgets.QPushButton("Build")
+        self.build_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.build_button)
+
+        self.cancel_button = QtWidgets.QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.cancel_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def get_name(self):
+        return self.name_edit.text().strip()
+
+    def get_key(self):
+        return self.key_edit.text().strip()
+
+    def get_selected_mods(self):
+        return [self.mod_list.item(i).text() for i in range(self.mod_list.count())
+                if self.mod_list.item(i).checkState() == QtCore.Qt.Checked]
+
+    def accept(self):
+        if not self.get_name() or not self.get_key():
+            QtWidgets.QMessageBox.warning(self, 'Warning', 'Name and key must be non-empty')
+            return
+        if self.get_name() in self.get_selected_mods():
+            QtWidgets.QMessageBox.warning(self, 'Warning', 'Name must be different from the selected mods')
+            return
+        if len(self.get_selected_mods()) < 2:
+            QtWidgets.QMessageBox.warning(self, 'Warning', 'Select at least two mods to merge')
+            return
+        try:
+            check_merged_name(self.main_folder, self.get_name())
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, 'Warning', str(e))
+            return
+        super().accept()
+
 
 class ModManagerApp(QtWidgets.QWidget):
     def __init__(self):
@@ -225,12 +975,28 @@ class ModManagerApp(QtWidgets.QWidget):
         self.search_text = ''
         self.locked = False
         self.fixer_found = False
+        self.fixer_files = []
         self.sorting_option = 'Name'
+        self.path_cache = {}
+        self.path_thread = None
+        self.path_threads = []
+        self.broken_mods = {}
+        self.broken_root = ''
+        self.validation_cache = {}
+        self.validate_thread = None
+        self.merge_thread = None
+        self.groups_thread = None
+        self.mod_groups = {}
+        self.group_index = {}
+        self.index_thread = None
+        self.index_pending = False
+        self.indexed_roots = set()
+        self.search_matches = None
+        self.move_threads = []
+        self.pending_moves = 0
 
         self.initUI()
         self.auto_fill_mods_path()
-        self.check_for_fixer()
-        self.load_presets()
 
     def initUI(self):
         self.setWindowTitle('Mod Manager')
@@ -245,6 +1011,12 @@ class ModManagerApp(QtWidgets.QWidget):
 
         self.path_entry = QtWidgets.QLineEdit(self.main_folder)
         self.path_entry.textChanged.connect(self.validate_path)
+
+        # Path checks touch the disk, so wait for typing to settle first
+        self.path_timer = QtCore.QTimer()
+        self.path_timer.setSingleShot(True)
+        self.path_timer.setInterval(PATH_CHECK_DELAY)
+        self.path_timer.timeout.connect(self.start_path_check)
         path_layout.addWidget(self.path_entry)
 
         self.lock_button = QtWidgets.QPushButton('Lock')
@@ -256,7 +1028,7 @@ class ModManagerApp(QtWidgets.QWidget):
 
         search_layout = QtWidgets.QHBoxLayout()
         self.search_entry = QtWidgets.QLineEdit()
-        self.search_entry.setPlaceholderText('Search Mods...')
+        self.search_entry.setPlaceholderText('Search Mods... (key:, tag:, author:, name:)')
         self.search_entry.textChanged.connect(self.update_search)
         search_layout.addWidget(self.search_entry)
 
@@ -280,9 +1052,21 @@ class ModManagerApp(QtWidgets.QWidget):
 
         button_layout = QtWidgets.QHBoxLayout()
         self.refresh_button = QtWidgets.QPushButton('Refresh')
-        self.refresh_button.clicked.connect(self.display_folders)
+        self.refresh_button.clicked.connect(self.refresh)
         button_layout.addWidget(self.refresh_button)
 
+        self.validate_button = QtWidgets.QPushButton('Validate')
+        self.validate_button.clicked.connect(self.validate_mods)
+        button_layout.addWidget(self.validate_button)
+
+        self.merge_button = QtWidgets.QPushButton('Build Merged')
+        self.merge_button.clicked.connect(self.build_merged)
+        button_layout.addWidget(self.merge_button)
+
+        self.infer_groups_button = QtWidgets.QPushButton('Infer Groups')
+        self.infer_groups_button.clicked.connect(self.infer_groups)
+        button_layout.addWidget(self.infer_groups_button)
+
         self.auto_refresh_check = QtWidgets.QCheckBox('Auto Refresh')
         self.auto_refresh_check.setStyleSheet("color: white;")
         self.auto_refresh_check.setChecked(self.auto_refresh_state)
@@ -377,15 +1161,99 @@ class ModManagerApp(QtWidgets.QWidget):
     def closeEvent(self, event):
         self.settings.setValue('main_folder', self.main_folder)
         self.settings.setValue('auto_refresh_state', self.auto_refresh_check.isChecked())
+        # Background readers stop early, moves and merges are left to finish.
+        # Qt aborts if a QThread is destroyed while still running.
+        readers = list(self.path_threads) + [t for t in (self.index_thread, self.validate_thread, self.groups_thread) if t is not None]
+        for thread in readers:
+            thread.requestInterruption()
+        writers = list(self.move_threads) + ([self.merge_thread] if self.merge_thread is not None else [])
+        for thread in readers + writers:
+            thread.wait()
         event.accept()
 
     def validate_path(self):
         self.main_folder = self.path_entry.text()
-        valid = len(self.main_folder) > 3 and '\\' in self.main_folder
+        if self.path_thread is not None:
+            self.path_thread.requestInterruption()
+            self.path_thread = None
+        if self.main_folder in self.path_cache:
+            self.apply_path_state(self.path_cache[self.main_folder])
+        else:
+            self.refresh_button.setEnabled(False)
+            self.auto_refresh_check.setEnabled(False)
+            self.validate_button.setEnabled(False)
+        # Cached paths are checked again in the background too, the folder may have gone
+        self.path_timer.start()
+
+    def start_path_check(self):
+        thread = PathCheckThread(self.main_folder)
+        thread.path_checked.connect(self.on_path_checked)
+        thread.finished.connect(lambda: self.path_threads.remove(thread))
+        self.path_threads.append(thread)
+        self.path_thread = thread
+        thread.start()
+
+    def on_path_checked(self, path, state):
+        # An invalid path is checked again next time, the folder may exist by then
+        if state[0]:
+            self.path_cache[path] = state
+        else:
+            self.path_cache.pop(path, None)
+        if path == self.main_folder:
+            self.path_thread = None
+            self.apply_path_state(state)
+
+    def apply_path_state(self, state):
+        valid, fixer_files, preset_names, groups, mods_root = state
+        # Broken flags belong to the folder that was validated
+        if self.broken_root != self.main_folder:
+            self.broken_mods = {}
+        self.mod_groups = groups
+        self.group_index = index_groups(groups)
         self.refresh_button.setEnabled(valid)
         self.auto_refresh_check.setEnabled(valid)
-        self.check_for_fixer()
-        self.load_presets()
+        self.validate_button.setEnabled(valid and self.validate_thread is None)
+        self.fixer_files = fixer_files
+        self.fixer_found = bool(fixer_files)
+        self.run_fixer_button.setVisible(self.fixer_found)
+        self.preset_combo.clear()
+        self.preset_combo.addItems(preset_names)
+        # Results from the previous folder don't apply, the next index run or keystroke refreshes them
+        self.search_matches = None
+        # Only index folders that look like a 3dmigoto Mods folder, once per session
+        if valid and mods_root and self.main_folder not in self.indexed_roots:
+            self.update_index()
+
+    def refresh(self):
+        # Pick up fixers, presets and groups changed outside the app
+        self.path_cache.pop(self.main_folder, None)
+        self.validate_path()
+        self.update_index()
+        self.display_folders()
+
+    def update_index(self):
+        if self.index_thread is not None:
+            self.index_pending = True
+            return
+        if not os.path.isdir(self.main_folder):
+            return
+
+        self.index_pending = False
+        self.indexed_roots.add(self.main_folder)
+        mods = [(name, path) for name, action, path in self.list_mods()]
+        self.index_thread = IndexThread(self.main_folder, mods)
+        self.index_thread.index_updated.connect(self.on_index_updated)
+        self.index_thread.start()
+
+    def on_index_updated(self, status):
+        # Indexing runs in the background, a failed run just keeps the previous index
+        self.index_thread = None
+        # The path may have moved on to a folder that was never confirmed as a mods root
+        if self.index_pending and self.main_folder in self.indexed_roots:
+            self.update_index()
+        elif self.search_text:
+            self.search_matches = search_index(self.main_folder, self.search_text)
+            self.display_folders()
 
     def toggle_auto_refresh(self):
         if self.auto_refresh_check.isChecked():
@@ -397,6 +1265,8 @@ class ModManagerApp(QtWidgets.QWidget):
         self.locked = checked
         self.path_entry.setReadOnly(self.locked)
         self.lock_button.setText('Unlock' if self.locked else 'Lock')
+        if self.locked:
+            self.update_index()
 
     def toggle_always_on_top(self, checked):
         if checked:
@@ -407,6 +1277,7 @@ class ModManagerApp(QtWidgets.QWidget):
 
     def update_search(self, text):
         self.search_text = text
+        self.search_matches = search_index(self.main_folder, text)
         self.display_folders()
 
     def update_filter(self):
@@ -423,7 +1294,8 @@ class ModManagerApp(QtWidgets.QWidget):
         self.display_folders()
 
     def display_folders(self):
-        if self.hovering:
+        # Listing while folders are in flight would show mods in the wrong place
+        if self.hovering or self.pending_moves:
             return
 
         self.main_folder = self.path_entry.text()
@@ -463,7 +1335,7 @@ class ModManagerApp(QtWidgets.QWidget):
         filtered_folders = []
         for folder, action in all_folders:
             if self.filter_state == 'All' or (self.filter_state == 'Enabled' and action == 'Disable') or (self.filter_state == 'Disabled' and action == 'Enable'):
-                if self.search_text.lower() in folder.lower():
+                if self.search_text.lower() in folder.lower() or (self.search_matches is not None and folder in self.search_matches):
                     filtered_folders.append((folder, action))
 
         for folder, action in filtered_folders:
@@ -472,12 +1344,19 @@ class ModManagerApp(QtWidgets.QWidget):
 
     def toggle_folder(self, folder_name, action, item):
         item.set_status('Moving')
-        self.move_thread = MoveThread(folder_name, action, self.main_folder)
-        self.move_thread.update_status.connect(self.on_move_complete)
-        self.move_thread.item = item
-        self.move_thread.start()
+        group_members = []
+        if folder_name in self.group_index:
+            group_members = self.mod_groups[self.group_index[folder_name]]
+        move_thread = MoveThread(folder_name, action, self.main_folder, group_members)
+        move_thread.update_status.connect(self.on_move_complete)
+        move_thread.finished.connect(lambda: self.move_threads.remove(move_thread))
+        move_thread.item = item
+        self.move_threads.append(move_thread)
+        self.pending_moves += 1
+        move_thread.start()
 
     def on_move_complete(self, status, action, folder_name):
+        self.pending_moves -= 1
         if status == 'Success':
             # Remove success message box
             pass
@@ -485,6 +1364,29 @@ class ModManagerApp(QtWidgets.QWidget):
             QtWidgets.QMessageBox.critical(self, 'Error', status)
         self.display_folders()
 
+    def start_move_task(self, callback, task, *args):
+        thread = TaskThread(callback, task, args)
+        thread.task_done.connect(self.on_task_done)
+        thread.finished.connect(lambda: self.move_threads.remove(thread))
+        self.move_threads.append(thread)
+        self.pending_moves += 1
+        thread.start()
+
+    def on_task_done(self, status, result, callback):
+        self.pending_moves -= 1
+        callback(status, result)
+
+    def rename_folder(self, folder_name, action, new_name):
+        def on_renamed(status, result):
+            if status == 'Success':
+                self.update_group_names(folder_name, new_name)
+                self.update_index_names(folder_name, new_name)
+            self.display_folders()
+            if status != 'Success':
+                QtWidgets.QMessageBox.critical(self, 'Error', status)
+
+        self.start_move_task(on_renamed, rename_mod, self.main_folder, folder_name, action, new_name)
+
     def on_hover_change(self, is_hovering):
         self.hovering = is_hovering
         if not is_hovering and self.auto_refresh_check.isChecked():
@@ -498,27 +1400,114 @@ class ModManagerApp(QtWidgets.QWidget):
             return []
 
         keys = []
-        with open(merged_ini_path, 'r') as file:
+        # The merger writes UTF-8, variant names in the header may not fit the locale encoding
+        with open(merged_ini_path, 'r', encoding='utf-8', errors='ignore') as file:
             for line in file:
                 match = re.match(r'key\s*=\s*(.*)', line, re.IGNORECASE)
                 if match:
                     keys.append(match.group(1).strip())
         return keys
 
-    def update_preset_names(self, old_name, new_name):
+    def save_groups(self):
         try:
-            with open(PRESETS_FILE, 'r') as file:
-                presets = json.load(file)
-            for preset in presets.get(self.main_folder, {}).values():
-                if old_name in preset['enabled']:
-                    preset['enabled'].remove(old_name)
-                    preset['enabled'].append(new_name)
-                if old_name in preset['disabled']:
-                    preset['disabled'].remove(old_name)
-                    preset['disabled'].append(new_name)
-            with open(PRESETS_FILE, 'w') as file:
-                json.dump(presets, file, indent=4)
+            with open(GROUPS_FILE, 'r') as file:
+                groups = json.load(file)
         except FileNotFoundError:
+            groups = {}
+
+        groups[self.main_folder] = {group: mods for group, mods in self.mod_groups.items() if mods}
+
+        with open(GROUPS_FILE, 'w') as file:
+            json.dump(groups, file, indent=4)
+
+        self.mod_groups = groups[self.main_folder]
+        self.group_index = index_groups(self.mod_groups)
+        if self.main_folder in self.path_cache:
+            valid, fixer_files, preset_names, _, mods_root = self.path_cache[self.main_folder]
+            self.path_cache[self.main_folder] = (valid, fixer_files, preset_names, self.mod_groups, mods_root)
+
+    def set_mod_group(self, folder_name):
+        current_group = self.group_index.get(folder_name, '')
+        group, ok = QtWidgets.QInputDialog.getText(self, 'Exclusive Group', f'Group for "{folder_name}" (leave empty to remove):', text=current_group)
+        if not ok:
+            return
+
+        group = group.strip()
+        if current_group:
+            self.mod_groups[current_group] = [mod for mod in self.mod_groups[current_group] if mod != folder_name]
+        if group:
+            self.mod_groups.setdefault(group, []).append(folder_name)
+        self.save_groups()
+        self.display_folders()
+
+    def update_group_names(self, old_name, new_name):
+        if old_name in self.group_index:
+            mods = self.mod_groups[self.group_index[old_name]]
+            mods[mods.index(old_name)] = new_name
+            self.save_groups()
+
+    def infer_groups(self):
+        if self.groups_thread is not None or not os.path.isdir(self.main_folder):
+            return
+
+        # Grouped mods are read too, so new mods can join the groups they belong to
+        mods = [(name, path) for name, action, path in self.list_mods()]
+        self.infer_groups_button.setEnabled(False)
+        self.infer_groups_button.setText('Inferring...')
+        self.groups_thread = InferGroupsThread(mods, self.mod_groups)
+        self.groups_thread.groups_inferred.connect(self.on_groups_inferred)
+        self.groups_thread.start()
+
+    def on_groups_inferred(self, groups):
+        self.groups_thread = None
+        self.infer_groups_button.setText('Infer Groups')
+        self.infer_groups_button.setEnabled(True)
+        if not groups:
+            QtWidgets.QMessageBox.information(self, 'Success', 'No new exclusive groups found')
+            return
+
+        for group, mods in groups.items():
+            members = self.mod_groups.setdefault(group, [])
+            members += [mod for mod in mods if mod not in members]
+        self.save_groups()
+        self.display_folders()
+        QtWidgets.QMessageBox.information(self, 'Success', f'{sum(len(mods) for mods in groups.values())} mod(s) added to exclusive groups')
+
+    def set_mod_tags(self, folder_name):
+        try:
+            connection = open_index()
+            try:
+                tags = [tag for (tag,) in connection.execute('SELECT tag FROM tags WHERE root = ? AND name = ?', (self.main_folder, folder_name))]
+                text, ok = QtWidgets.QInputDialog.getText(self, 'Tags', f'Tags for "{folder_name}" (comma separated):', text=', '.join(tags))
+                if not ok:
+                    return
+
+                tags = sorted({tag.strip() for tag in text.split(',') if tag.strip()})
+                with connection:
+                    connection.execute('DELETE FROM tags WHERE root = ? AND name = ?', (self.main_folder, folder_name))
+                    connection.executemany('INSERT INTO tags (root, name, tag) VALUES (?, ?, ?)', [(self.main_folder, folder_name, tag) for tag in tags])
+                    connection.execute('UPDATE mod_text SET tags = ? WHERE rowid = (SELECT id FROM mods WHERE root = ? AND name = ?)',
+                                       (', '.join(tags), self.main_folder, folder_name))
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            QtWidgets.QMessageBox.critical(self, 'Error', f'Failed to save tags: {str(e)}')
+            return
+
+        self.search_matches = search_index(self.main_folder, self.search_text)
+        self.display_folders()
+
+    def update_index_names(self, old_name, new_name):
+        try:
+            connection = open_index()
+            try:
+                with connection:
+                    connection.execute('UPDATE mod_text SET name = ? WHERE rowid = (SELECT id FROM mods WHERE root = ? AND name = ?)', (new_name, self.main_folder, old_name))
+                    connection.execute('UPDATE mods SET name = ? WHERE root = ? AND name = ?', (new_name, self.main_folder, old_name))
+                    connection.execute('UPDATE tags SET name = ? WHERE root = ? AND name = ?', (new_name, self.main_folder, old_name))
+            finally:
+                connection.close()
+        except sqlite3.Error:
             pass
 
     def save_preset(self):
@@ -557,14 +1546,12 @@ class ModManagerApp(QtWidgets.QWidget):
         QtWidgets.QMessageBox.information(self, 'Success', 'Preset saved successfully')
 
     def load_presets(self):
+        preset_names = read_preset_names(self.main_folder)
+        if self.main_folder in self.path_cache:
+            valid, fixer_files, _, groups, mods_root = self.path_cache[self.main_folder]
+            self.path_cache[self.main_folder] = (valid, fixer_files, preset_names, groups, mods_root)
         self.preset_combo.clear()
-        try:
-            with open(PRESETS_FILE, 'r') as file:
-                presets = json.load(file)
-            directory_presets = presets.get(self.main_folder, {})
-            self.preset_combo.addItems(directory_presets.keys())
-        except FileNotFoundError:
-            pass
+        self.preset_combo.addItems(preset_names)
 
     def load_preset(self):
         preset_name = self.preset_combo.currentText()
@@ -587,27 +1574,30 @@ class ModManagerApp(QtWidgets.QWidget):
         enabled_mods = preset_data['enabled']
         disabled_mods = preset_data['disabled']
 
-        missing_mods = []
-
-        for mod in enabled_mods:
-            source = os.path.join(os.path.dirname(self.main_folder), 'disabledMods', mod)
-            destination = os.path.join(self.main_folder, mod)
-            if os.path.exists(source):
-                shutil.move(source, destination)
-            else:
-                missing_mods.append(mod)
-
-        for mod in disabled_mods:
-            source = os.path.join(self.main_folder, mod)
-            destination = os.path.join(os.path.dirname(self.main_folder), 'disabledMods', mod)
-            if os.path.exists(source):
-                shutil.move(source, destination)
-            else:
-                missing_mods.append(mod)
+        conflicts = find_group_conflicts(enabled_mods, self.group_index)
+        if conflicts:
+            details = '; '.join(f'{group}: {", ".join(mods)}' for group, mods in conflicts.items())
+            reply = QtWidgets.QMessageBox.question(self, 'Confirmation', f'This preset enables more than one mod of the same exclusive group ({details}). Do you want to load it anyway?',
+                                                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No)
+            if reply == QtWidgets.QMessageBox.No:
+                return
 
+        self.load_preset_button.setEnabled(False)
+        preset_thread = PresetThread(self.main_folder, enabled_mods, disabled_mods)
+        preset_thread.preset_loaded.connect(self.on_preset_loaded)
+        preset_thread.finished.connect(lambda: self.move_threads.remove(preset_thread))
+        self.move_threads.append(preset_thread)
+        self.pending_moves += 1
+        preset_thread.start()
+
+    def on_preset_loaded(self, missing_mods, failed_mods):
+        self.pending_moves -= 1
+        self.load_preset_button.setEnabled(True)
         self.display_folders()
 
-        if missing_mods:
+        if failed_mods:
+            QtWidgets.QMessageBox.critical(self, 'Error', f'The following mods could not be moved: {", ".join(failed_mods)}')
+        elif missing_mods:
             QtWidgets.QMessageBox.warning(self, 'Warning', f'The following mods were missing and could not be loaded: {", ".join(missing_mods)}')
         else:
             QtWidgets.QMessageBox.information(self, 'Success', 'Preset loaded successfully')
@@ -683,30 +1673,14 @@ class ModManagerApp(QtWidgets.QWidget):
         QtWidgets.QMessageBox.information(self, 'Success', f'Preset "{preset_name}" updated successfully')
 
 
-    def check_for_fixer(self):
-        # Check in the main folder
-        fixer_files_main = glob.glob(os.path.join(self.main_folder, 'genshin_update_mods_*.exe'))
-
-        # Check in the parent folder of the main folder
-        parent_folder = os.path.dirname(self.main_folder)
-        fixer_files_parent = glob.glob(os.path.join(parent_folder, 'genshin_update_mods_*.exe'))
-
-        # Combine the results
-        fixer_files = fixer_files_main + fixer_files_parent
-
-        if fixer_files:
-            self.fixer_found = True
-            self.run_fixer_button.setVisible(True)
-        else:
-            self.fixer_found = False
-            self.run_fixer_button.setVisible(False)
-
     def run_fixer(self):
-        fixer_files_main = glob.glob(os.path.join(self.main_folder, 'genshin_update_mods_*.exe'))
-        fixer_files_parent = glob.glob(os.path.join(os.path.dirname(self.main_folder), 'genshin_update_mods_*.exe'))
-        fixer_files = fixer_files_main + fixer_files_parent
+        fixer_files = [f for f in self.fixer_files if os.path.isfile(f)]
         if fixer_files:
             os.startfile(fixer_files[0])
+        else:
+            # The cached lookup went stale, check the disk again
+            self.path_cache.pop(self.main_folder, None)
+            self.validate_path()
 
     def mark_as_broken(self, folder_name, action):
         if not self.confirmation_shown:
@@ -723,20 +1697,144 @@ class ModManagerApp(QtWidgets.QWidget):
                 self.confirmation_shown = True
                 self.settings.setValue('confirmation_shown', True)
 
-        source_folder = os.path.join(self.main_folder, folder_name) if action == 'Disable' else os.path.join(os.path.dirname(self.main_folder), 'disabledMods', folder_name)
-        target_folder = os.path.join(os.path.dirname(self.main_folder), 'brokenMods')
-        if not os.path.exists(target_folder):
-            os.makedirs(target_folder)
-
-        if os.path.exists(source_folder):
-            try:
-                shutil.move(source_folder, target_folder)
+        def on_marked(status, result):
+            self.display_folders()
+            if status == 'Success':
                 QtWidgets.QMessageBox.information(self, 'Success', f'Mod "{folder_name}" marked as broken.')
-                self.display_folders()
-            except Exception as e:
-                QtWidgets.QMessageBox.critical(self, 'Error', f'Failed to mark as broken: {str(e)}')
+            else:
+                QtWidgets.QMessageBox.critical(self, 'Error', f'Failed to mark as broken: {status}')
+
+        self.start_move_task(on_marked, mark_mod_broken, self.main_folder, folder_name, action)
+
+    def list_mods(self):
+        disabled_folder = os.path.join(os.path.dirname(self.main_folder), 'disabledMods')
+        mods = [(f, 'Disable', os.path.join(self.main_folder, f)) for f in os.listdir(self.main_folder) if os.path.isdir(os.path.join(self.main_folder, f))]
+        if os.path.exists(disabled_folder):
+            mods += [(f, 'Enable', os.path.join(disabled_folder, f)) for f in os.listdir(disabled_folder) if os.path.isdir(os.path.join(disabled_folder, f))]
+        return mods
+
+    def validate_mods(self):
+        if self.validate_thread is not None or not os.path.isdir(self.main_folder):
+            return
+
+        self.validate_button.setEnabled(False)
+        self.validate_button.setText('Validating...')
+        self.validate_thread = ValidateThread(self.main_folder, self.list_mods(), self.validation_cache)
+        self.validate_thread.validation_done.connect(self.on_validation_done)
+        self.validate_thread.start()
+
+    def on_validation_done(self, main_folder, results):
+        self.validate_thread = None
+        self.validate_button.setText('Validate')
+        self.validate_button.setEnabled(True)
+        # Results name mods of the folder that was validated, not whatever the path is now
+        if main_folder != self.main_folder:
+            return
+        self.broken_root = main_folder
+        self.broken_mods = {name: result for name, result in results.items() if result[1]}
+        self.display_folders()
+
+        if not self.broken_mods:
+            QtWidgets.QMessageBox.information(self, 'Success', 'No broken mods found')
+            return
+
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            'Confirmation',
+            f'{len(self.broken_mods)} mod(s) look broken: {", ".join(sorted(self.broken_mods))}. Do you want to move them all to brokenMods?',
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            QtWidgets.QMessageBox.No
+        )
+        if reply == QtWidgets.QMessageBox.Yes:
+            self.move_broken_mods()
+
+    def move_broken_mods(self):
+        def move_all(main_folder, mods):
+            moved_mods, failed_mods = [], []
+            for folder_name, action in mods:
+                try:
+                    mark_mod_broken(main_folder, folder_name, action)
+                    moved_mods.append(folder_name)
+                except Exception as e:
+                    failed_mods.append(f'{folder_name} ({e})')
+            return moved_mods, failed_mods
+
+        if self.broken_root != self.main_folder:
+            return
+        mods = [(folder_name, action) for folder_name, (action, problems) in self.broken_mods.items()]
+        self.start_move_task(self.on_broken_mods_moved, move_all, self.broken_root, mods)
+
+    def on_broken_mods_moved(self, status, result):
+        moved_mods, failed_mods = result if result else ([], [status])
+        for folder_name in moved_mods:
+            self.broken_mods.pop(folder_name, None)
+
+        self.display_folders()
+
+        if failed_mods:
+            QtWidgets.QMessageBox.warning(self, 'Warning', f'The following mods could not be moved: {", ".join(failed_mods)}')
         else:
-            QtWidgets.QMessageBox.critical(self, 'Error', 'Source folder not found.')
+            QtWidgets.QMessageBox.information(self, 'Success', 'Broken mods moved successfully')
+
+    def build_merged(self):
+        if self.merge_thread is not None or not os.path.isdir(self.main_folder):
+            return
+
+        mods = {name: path for name, action, path in self.list_mods()}
+        dialog = MergeDialog(sorted(mods, key=str.lower), self.main_folder, self)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+
+        variants = [(name, mods[name]) for name in dialog.get_selected_mods()]
+        output_folder = os.path.join(self.main_folder, dialog.get_name())
+        self.merge_button.setEnabled(False)
+        self.merge_button.setText('Merging...')
+        self.merge_thread = MergeThread(output_folder, variants, dialog.get_key())
+        self.merge_thread.update_status.connect(self.on_merge_complete)
+        self.merge_thread.start()
+
+    def on_merge_complete(self, status, variants):
+        self.merge_thread = None
+        self.merge_button.setText('Build Merged')
+        self.merge_button.setEnabled(True)
+        self.refresh()
+
+        if status != 'Success':
+            QtWidgets.QMessageBox.critical(self, 'Error', status)
+            return
+
+        enabled_mods = [name for name, mod_path in variants if os.path.dirname(mod_path) == self.main_folder and os.path.isdir(mod_path)]
+        if not enabled_mods:
+            QtWidgets.QMessageBox.information(self, 'Success', 'Merged mod built successfully')
+            return
+
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            'Confirmation',
+            f'Merged mod built successfully. Do you want to disable the merged source mods ({", ".join(enabled_mods)}) so they do not load twice?',
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            QtWidgets.QMessageBox.Yes
+        )
+        if reply == QtWidgets.QMessageBox.No:
+            return
+
+        def disable_all(main_folder, mods):
+            failed_mods = []
+            for mod in mods:
+                try:
+                    move_mod(main_folder, mod, 'Disable')
+                except Exception as e:
+                    failed_mods.append(f'{mod} ({e})')
+            return failed_mods
+
+        self.start_move_task(self.on_merged_sources_disabled, disable_all, self.main_folder, enabled_mods)
+
+    def on_merged_sources_disabled(self, status, failed_mods):
+        failed_mods = failed_mods if status == 'Success' else [status]
+        self.display_folders()
+
+        if failed_mods:
+            QtWidgets.QMessageBox.warning(self, 'Warning', f'The following mods could not be disabled: {", ".join(failed_mods)}')
 
     def open_directory(self, index):
         if index == 0:
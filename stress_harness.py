@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import errno
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+import concurrent.futures
+
+import mod_manager
+
+OPERATIONS = ('toggle', 'rename', 'preset', 'broken')
+OPERATION_WEIGHTS = (70, 15, 10, 5)
+MARKER_FILE = 'harness_id.txt'
+
+class FaultInjector:
+    def __init__(self, seed, fault_rate):
+        self.seed = seed
+        self.fault_rate = fault_rate
+        self.local = threading.local()
+        self.counts = {'permission': 0, 'disk_full': 0, 'locked': 0, 'locked_delete': 0}
+        self.counts_lock = threading.Lock()
+        self.real_rename = os.rename
+        self.real_copytree = shutil.copytree
+        self.real_rmtree = shutil.rmtree
+
+    def begin(self, index):
+        # Faults are drawn from the operation index so a run replays with the same seed
+        self.local.random = random.Random(f'{self.seed}-{index}')
+
+    def count(self, fault):
+        with self.counts_lock:
+            self.counts[fault] += 1
+
+    def rename(self, source, target):
+        rng = getattr(self.local, 'random', None)
+        if rng is not None and rng.random() < self.fault_rate:
+            fault = rng.choice(('permission', 'disk_full', 'locked', 'locked_delete'))
+            self.count(fault)
+            if fault == 'permission':
+                raise PermissionError(errno.EACCES, 'Injected permission error', source)
+            if fault == 'disk_full':
+                raise OSError(errno.ENOSPC, 'Injected disk full', target)
+            # Pretend the target is on another drive so the move copies and hits a locked file,
+            # either while copying or while deleting the source afterwards
+            if fault == 'locked':
+                self.local.lock_copy = True
+            else:
+                self.local.lock_delete = source
+            raise OSError(errno.EXDEV, 'Injected cross-device move', source)
+        return self.real_rename(source, target)
+
+    def copytree(self, source, target, *args, **kwargs):
+        if not getattr(self.local, 'lock_copy', False):
+            return self.real_copytree(source, target, *args, **kwargs)
+        self.local.lock_copy = False
+        os.makedirs(target)
+        for name in sorted(os.listdir(source))[:1]:
+            shutil.copy2(os.path.join(source, name), os.path.join(target, name))
+        raise PermissionError(errno.EACCES, 'Injected locked file mid-move', source)
+
+    def rmtree(self, path, *args, **kwargs):
+        if getattr(self.local, 'lock_delete', None) != path:
+            return self.real_rmtree(path, *args, **kwargs)
+        self.local.lock_delete = None
+        root, dirs, files = next(os.walk(path))
+        for name in sorted(files)[:1]:
+            os.remove(os.path.join(root, name))
+        raise PermissionError(errno.EACCES, 'Injected locked file while deleting', path)
+
+    def install(self):
+        os.rename = self.rename
+        shutil.copytree = self.copytree
+        shutil.rmtree = self.rmtree
+
+    def uninstall(self):
+        os.rename = self.real_rename
+        shutil.copytree = self.real_copytree
+        shutil.rmtree = self.real_rmtree
+
+def create_tree(root, mod_count):
+    main_folder = os.path.join(root, 'Mods')
+    disabled_folder = os.path.join(root, 'disabledMods')
+    os.makedirs(main_folder)
+    os.makedirs(disabled_folder)
+    for i in range(mod_count):
+        mod_path = os.path.join(main_folder if i % 2 else disabled_folder, f'Mod{i:04d}')
+        os.makedirs(os.path.join(mod_path, 'Textures'))
+        with open(os.path.join(mod_path, MARKER_FILE), 'w') as file:
+            file.write(str(i))
+        with open(os.path.join(mod_path, 'mod.ini'), 'w') as file:
+            file.write(f'[TextureOverrideMod{i}]\nhash = {i:08x}\n')
+        with open(os.path.join(mod_path, 'Textures', 'diffuse.dds'), 'wb') as file:
+            file.write(os.urandom(64))
+    return main_folder
+
+def list_folders(path):
+    if not os.path.isdir(path):
+        return []
+    return [f for f in os.listdir(path) if os.path.isdir(os.path.join(path, f))]
+
+def list_mods(main_folder):
+    disabled_folder = os.path.join(os.path.dirname(main_folder), 'disabledMods')
+    return [(f, 'Disable') for f in list_folders(main_folder)] + [(f, 'Enable') for f in list_folders(disabled_folder)]
+
+def create_presets(main_folder, rng, preset_count):
+    names = [name for name, action in list_mods(main_folder)]
+    presets = {}
+    for i in range(preset_count):
+        enabled = set(rng.sample(names, len(names) // 2))
+        presets[f'Preset{i}'] = {'enabled': sorted(enabled), 'disabled': sorted(set(names) - enabled)}
+    with open(mod_manager.PRESETS_FILE, 'w') as file:
+        json.dump({main_folder: presets}, file, indent=4)
+
+def run_operation(main_folder, operation, rng, index):
+    mods = list_mods(main_folder)
+    if not mods:
+        return
+    folder_name, action = rng.choice(mods)
+    if operation == 'toggle':
+        mod_manager.move_mod(main_folder, folder_name, action)
+    elif operation == 'rename':
+        mod_manager.rename_mod(main_folder, folder_name, action, f'{folder_name.split("~")[0]}~{index}')
+    elif operation == 'broken':
+        mod_manager.mark_mod_broken(main_folder, folder_name, action)
+    else:
+        # Renames rewrite the presets file under the move lock
+        with mod_manager.MOVE_LOCK:
+            with open(mod_manager.PRESETS_FILE, 'r') as file:
+                presets = json.load(file)[main_folder]
+        preset = presets[rng.choice(sorted(presets))]
+        missing_mods, failed_mods = mod_manager.apply_preset(main_folder, preset['enabled'], preset['disabled'])
+        # apply_preset reports per-mod failures instead of raising
+        if failed_mods:
+            raise OSError(f'{len(failed_mods)} mod(s) failed to move')
+
+def check_invariants(root, main_folder, mod_count):
+    problems = []
+    locations = {}
+    for folder in (main_folder, os.path.join(root, 'disabledMods'), os.path.join(root, 'brokenMods')):
+        for name in list_folders(folder):
+            mod_path = os.path.join(folder, name)
+            # A mod moved onto an existing folder of the same name ends up nested in it
+            if os.path.isdir(os.path.join(mod_path, name)) or any(os.path.isfile(os.path.join(mod_path, f, MARKER_FILE)) for f in list_folders(mod_path)):
+                problems.append(f'Nested mod folder: {mod_path}')
+            try:
+                with open(os.path.join(mod_path, MARKER_FILE), 'r') as file:
+                    mod_id = int(file.read())
+            except (OSError, ValueError):
+                problems.append(f'Leftover folder without a mod: {mod_path}')
+                continue
+            locations.setdefault(mod_id, []).append(mod_path)
+            if not os.path.isfile(os.path.join(mod_path, 'Textures', 'diffuse.dds')):
+                problems.append(f'Incomplete mod: {mod_path}')
+
+    for mod_id in range(mod_count):
+        if mod_id not in locations:
+            problems.append(f'Lost mod: {mod_id}')
+        elif len(locations[mod_id]) > 1:
+            problems.append(f'Duplicated mod {mod_id}: {", ".join(locations[mod_id])}')
+
+    names = {os.path.basename(path) for paths in locations.values() for path in paths}
+    with open(mod_manager.PRESETS_FILE, 'r') as file:
+        presets = json.load(file).get(main_folder, {})
+    for preset_name, preset in presets.items():
+        if set(preset['enabled']) & set(preset['disabled']):
+            problems.append(f'Preset {preset_name} both enables and disables {", ".join(set(preset["enabled"]) & set(preset["disabled"]))}')
+        for name in set(preset['enabled']) | set(preset['disabled']):
+            if name not in names:
+                problems.append(f'Preset {preset_name} refers to a missing mod: {name}')
+    return problems
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def print_report(latencies, failures, elapsed, faults):
+    print(f'{"operation":<10}{"count":>8}{"failed":>8}{"ops/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+    for operation in OPERATIONS:
+        values = latencies[operation]
+        if not values:
+            continue
+        print(f'{operation:<10}{len(values):>8}{failures[operation]:>8}{len(values) / elapsed:>10.1f}'
+              f'{percentile(values, 0.5) * 1000:>10.2f}{percentile(values, 0.99) * 1000:>10.2f}{max(values) * 1000:>10.2f}')
+    total = sum(len(values) for values in latencies.values())
+    print(f'{total} operations in {elapsed:.2f}s ({total / elapsed:.1f} ops/s)')
+    print('Injected faults: ' + ', '.join(f'{fault} {count}' for fault, count in faults.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description='Run random concurrent mod operations against a temporary 3dmigoto tree and check nothing gets lost.')
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8, help='use 1 for a fully deterministic replay of a seed')
+    parser.add_argument('--mods', type=int, default=200)
+    parser.add_argument('--presets', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fault-rate', type=float, default=0.05)
+    parser.add_argument('--keep', action='store_true', help='keep the temporary tree for inspection')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='modmanager_stress_')
+    mod_manager.PRESETS_FILE = os.path.join(root, 'mod_presets.json')
+    rng = random.Random(args.seed)
+    main_folder = create_tree(root, args.mods)
+    create_presets(main_folder, rng, args.presets)
+    operations = rng.choices(OPERATIONS, OPERATION_WEIGHTS, k=args.ops)
+
+    injector = FaultInjector(args.seed, args.fault_rate)
+    latencies = {operation: [] for operation in OPERATIONS}
+    failures = {operation: 0 for operation in OPERATIONS}
+    results_lock = threading.Lock()
+
+    def run(index):
+        operation = operations[index]
+        injector.begin(index)
+        start = time.perf_counter()
+        try:
+            run_operation(main_folder, operation, random.Random(f'{args.seed}-op-{index}'), index)
+            failed = False
+        except OSError:
+            # Races and injected faults are expected to fail cleanly, only the invariants matter
+            failed = True
+        latency = time.perf_counter() - start
+        with results_lock:
+            latencies[operation].append(latency)
+            failures[operation] += failed
+
+    injector.install()
+    try:
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(run, range(args.ops)))
+        elapsed = time.perf_counter() - start
+    finally:
+        injector.uninstall()
+
+    problems = check_invariants(root, main_folder, args.mods)
+    print_report(latencies, failures, elapsed, injector.counts)
+    for problem in problems:
+        print(f'INVARIANT VIOLATED: {problem}')
+    if args.keep:
+        print(f'Tree kept at {root}')
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    print('OK' if not problems else f'{len(problems)} invariant violation(s)')
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())